@@ -0,0 +1,749 @@
+"""Shared Transfermarkt scraping library for the defender-rumours reports.
+
+Holds the session, caches, parser shims and extraction/render code so
+entry scripts stay thin and the parser stack is imported once per
+process.
+"""
+import os
+import re
+import json
+import functools
+import hashlib
+import datetime as dt
+import threading
+import time
+from html import escape as esc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import requests
+
+# orjson serializes in C, ~5-10x faster than stdlib json; optional.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Prefer selectolax (Lexbor) for parsing: ~10-20x faster parse + CSS selection
+# than BeautifulSoup/lxml on these pages. BeautifulSoup stays as a fallback
+# when selectolax is not installed.
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    HAVE_SELECTOLAX = True
+except ImportError:
+    import soupsieve
+    from bs4 import BeautifulSoup
+    HAVE_SELECTOLAX = False
+
+    # Tag.select() re-parses the CSS selector string through Soup Sieve on
+    # every call; compile each distinct selector once and reuse it.
+    @functools.lru_cache(maxsize=None)
+    def _compiled_selector(selector: str):
+        return soupsieve.compile(selector)
+
+BASE_URL = "https://www.transfermarkt.com"
+COMPETITION = os.getenv("COMPETITION", "L1")
+SEASON_ID = os.getenv("SEASON_ID", "2025")
+URL = f"{BASE_URL}/bundesliga/geruechte/wettbewerb/{COMPETITION}/saison_id/{SEASON_ID}/plus/1"
+
+# Toggle profile lookups (age, nationality, contract expiry, market value)
+# Use 0 to skip profiles (faster, fewer requests)
+FETCH_PROFILES = os.getenv("FETCH_PROFILES", "1") == "1"
+PROFILE_SLEEP_S = float(os.getenv("PROFILE_SLEEP_S", "1.2"))
+PROFILE_WORKERS = int(os.getenv("PROFILE_WORKERS", "4"))
+
+# Profile pages change rarely; cache the extracted details on disk so
+# repeat runs skip almost all profile HTTP traffic. TTL 0 disables.
+PROFILE_CACHE_DIR = os.getenv("PROFILE_CACHE_DIR", "out/profile_cache")
+PROFILE_CACHE_TTL_S = float(os.getenv("PROFILE_CACHE_TTL_S", "86400"))
+
+# HTTP-level cache: store ETag/Last-Modified + body per URL and
+# revalidate with a conditional GET, so unchanged pages come back as a
+# bodyless 304. Empty string disables.
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", "out/http_cache")
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/127.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-GB,en;q=0.9,de;q=0.7",
+    "Referer": BASE_URL + "/",
+    "Connection": "keep-alive",
+}
+TIMEOUT = 30
+
+# One shared session: keep-alive across all fetches (listing + profiles)
+# and headers merged once instead of per request. requests.Session is
+# thread-safe for the profile worker pool; the adapter pool is sized for
+# it. max_retries=0 because fetch_with_retries owns the retry policy.
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+_ADAPTER = requests.adapters.HTTPAdapter(
+    pool_connections=4, pool_maxsize=16, max_retries=0)
+SESSION.mount("https://", _ADAPTER)
+SESSION.mount("http://", _ADAPTER)
+
+DEFENDER_KEYWORDS = {
+    "defender", "centre-back", "center-back", "centre back", "center back",
+    "left-back", "left back", "right-back", "right back",
+    "wing-back", "wingback", "full-back", "fullback",
+    # German and other common languages on TM
+    "innenverteidiger", "rechter verteidiger", "linker verteidiger",
+    "außenverteidiger", "aussenverteidiger", "verteidiger",
+}
+
+# Compiled once at import; Pattern methods skip the re-cache lookup that
+# re.sub/re.search with a literal pay on every call in the row loop.
+_WS_RE = re.compile(r"\s+")
+_MV_RE = re.compile(r"([€£$]\s?[0-9\.,]+[mMkK]?)")
+
+_SECS_PER_YEAR = 31556952  # 365.2425 * 86400, Gregorian mean year
+
+def norm(s: Optional[str]) -> str:
+    return _WS_RE.sub(" ", (s or "")).strip()
+
+def abs_url(raw: str) -> str:
+    # urljoin re-parses both URLs on every call; the hrefs here are either
+    # already absolute or host-relative, so handle those without parsing.
+    if not raw:
+        return ""
+    if raw.startswith("http"):
+        return raw
+    if raw.startswith("/"):
+        return BASE_URL + raw
+    return urljoin(BASE_URL, raw)
+
+# --- thin parser shim so the same extraction code runs on either backend ---
+
+def extract_table_fragment(html: str) -> str:
+    """Cut the document down to the rumours table before parsing.
+
+    The listing page is mostly nav/ads/scripts we never look at; feeding
+    only table.items to the parser skips building a tree for the rest.
+    Rows embed nested inline-tables, so balance <table openings against
+    </table> closings to find the matching end tag; on any mismatch fall
+    back to the full document.
+    """
+    start = html.find('<table class="items"')
+    if start == -1:
+        return html
+    depth = 0
+    pos = start
+    while True:
+        open_i = html.find("<table", pos + 1)
+        close_i = html.find("</table", pos + 1)
+        if close_i == -1:
+            return html
+        if open_i != -1 and open_i < close_i:
+            depth += 1
+            pos = open_i
+        elif depth > 0:
+            depth -= 1
+            pos = close_i
+        else:
+            gt = html.find(">", close_i)
+            end = gt + 1 if gt != -1 else close_i + len("</table")
+            return html[start:end]
+
+def parse_html(html):
+    if HAVE_SELECTOLAX:
+        return LexborHTMLParser(html)
+    return BeautifulSoup(html, "lxml")
+
+def css(node, selector: str) -> list:
+    if node is None:
+        return []
+    if HAVE_SELECTOLAX:
+        return node.css(selector)
+    return _compiled_selector(selector).select(node)
+
+def css_first(node, selector: str):
+    if node is None:
+        return None
+    if HAVE_SELECTOLAX:
+        return node.css_first(selector)
+    matches = _compiled_selector(selector).select(node, limit=1)
+    return matches[0] if matches else None
+
+def attr(node, name: str, default: str = "") -> str:
+    if node is None:
+        return default
+    if HAVE_SELECTOLAX:
+        val = node.attributes.get(name)
+    else:
+        val = node.get(name)
+    return val if val is not None else default
+
+def raw_text(el) -> str:
+    """Backend text extraction without the whitespace-normalizing regex."""
+    if el is None:
+        return ""
+    if HAVE_SELECTOLAX:
+        return el.text(separator=" ", strip=True)
+    return el.get_text(" ", strip=True)
+
+def text(el) -> str:
+    return norm(raw_text(el))
+
+def child_tds(tr) -> list:
+    """Direct <td> children of a row (no descent into nested tables)."""
+    if HAVE_SELECTOLAX:
+        return [c for c in tr.iter() if c.tag == "td"]
+    # plain child walk; find_all(recursive=False) routes through the full
+    # SoupStrainer matching machinery for what is a one-level tag filter
+    return [c for c in tr.children if getattr(c, "name", None) == "td"]
+
+def table_rows(table) -> list:
+    """Body rows of the outer table only.
+
+    Lexbor inserts implicit <tbody> into the nested inline-tables too, so a
+    plain "tbody > tr" descendant query would pick up inner rows as well.
+    """
+    if table is None:
+        return []
+    if HAVE_SELECTOLAX:
+        tbody = next((c for c in table.iter() if c.tag == "tbody"), None)
+        return [c for c in (tbody or table).iter() if c.tag == "tr"]
+    return css(table, "tbody > tr")
+
+def node_html(el) -> str:
+    if HAVE_SELECTOLAX:
+        return el.html or ""
+    return str(el)
+
+def next_sibling_element(el):
+    if HAVE_SELECTOLAX:
+        sib = el.next
+        while sib is not None and sib.tag == "-text":
+            sib = sib.next
+        return sib
+    return el.find_next(["span", "div"])
+
+# One alternation matching any keyword in a single scan instead of ~15
+# substring passes per call. Longest-first so e.g. "rechter verteidiger"
+# wins over plain "verteidiger".
+_DEFENDER_RE = re.compile(
+    "|".join(re.escape(k) for k in sorted(DEFENDER_KEYWORDS, key=len, reverse=True)),
+    re.IGNORECASE,
+)
+
+@functools.lru_cache(maxsize=4096)
+def is_defender(position_text: str) -> bool:
+    # Memoized: the position loop and the filter check in extract_rumour_row
+    # test the same string twice, and position labels repeat across rows.
+    return bool(_DEFENDER_RE.search(position_text or ""))
+
+class RateLimiter:
+    """Spaces requests at least interval_s apart across all worker threads."""
+
+    def __init__(self, interval_s: float):
+        self.interval_s = interval_s
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self) -> None:
+        if self.interval_s <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval_s
+        if delay > 0:
+            time.sleep(delay)
+
+# Aggregate politeness cap for profile fetches; per-worker sleeps would
+# scale the request rate with PROFILE_WORKERS.
+_PROFILE_LIMITER = RateLimiter(PROFILE_SLEEP_S)
+
+def fetch_with_retries(url: str, max_retries: int = 3, backoff: float = 1.6,
+                       headers: Optional[dict] = None) -> requests.Response:
+    last_exc = None
+    for i in range(1, max_retries + 1):
+        try:
+            resp = SESSION.get(url, headers=headers, timeout=TIMEOUT)
+            resp.raise_for_status()
+            return resp
+        except Exception as e:
+            last_exc = e
+            if i < max_retries:
+                time.sleep(backoff * i)
+    if last_exc:
+        raise last_exc
+    raise RuntimeError("Unknown error performing GET")
+
+def _http_cache_path(url: str) -> str:
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(HTTP_CACHE_DIR, digest + ".json")
+
+def _load_http_cache(url: str) -> Optional[dict]:
+    if not HTTP_CACHE_DIR:
+        return None
+    try:
+        with open(_http_cache_path(url), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _store_http_cache(url: str, etag: str, last_modified: str, body: str) -> None:
+    if not HTTP_CACHE_DIR:
+        return
+    try:
+        os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+        with open(_http_cache_path(url), "w", encoding="utf-8") as f:
+            json.dump({"etag": etag, "last_modified": last_modified, "body": body}, f,
+                      ensure_ascii=False)
+    except OSError:
+        pass  # cache is best-effort
+
+def fetch_html(url: str) -> str:
+    """GET a page, revalidating against the on-disk ETag/Last-Modified cache.
+
+    Unchanged pages answer 304 with no body, so repeat runs skip the
+    transfer (and TM's pages are large) while still seeing fresh content
+    the moment it changes.
+    """
+    entry = _load_http_cache(url)
+    cond_headers = {}
+    if entry:
+        if entry.get("etag"):
+            cond_headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            cond_headers["If-Modified-Since"] = entry["last_modified"]
+    resp = fetch_with_retries(url, headers=cond_headers or None)
+    if resp.status_code == 304 and entry:
+        return entry["body"]
+    # TM serves UTF-8; decoding explicitly skips the charset detection
+    # that resp.text runs whenever the Content-Type lacks a charset.
+    body = resp.content.decode("utf-8", "replace")
+    etag = resp.headers.get("ETag", "")
+    last_modified = resp.headers.get("Last-Modified", "")
+    if etag or last_modified:
+        _store_http_cache(url, etag, last_modified, body)
+    return body
+
+def parse_prob_from_style(style: str) -> Optional[int]:
+    # e.g. 'width:80%' or 'width: 40 %'; the value shape is simple enough
+    # that str.partition beats starting up the regex machinery per row
+    if not style:
+        return None
+    digits = style.partition("width")[2].partition(":")[2].partition("%")[0].strip()
+    if not digits.isdigit():
+        return None
+    return max(0, min(100, int(digits)))
+
+def _profile_cache_path(profile_url: str) -> str:
+    digest = hashlib.blake2b(profile_url.encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(PROFILE_CACHE_DIR, digest + ".json")
+
+def _load_cached_details(profile_url: str) -> Optional[dict]:
+    if PROFILE_CACHE_TTL_S <= 0:
+        return None
+    path = _profile_cache_path(profile_url)
+    try:
+        if time.time() - os.path.getmtime(path) > PROFILE_CACHE_TTL_S:
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _store_cached_details(profile_url: str, details: dict) -> None:
+    if PROFILE_CACHE_TTL_S <= 0:
+        return
+    try:
+        os.makedirs(PROFILE_CACHE_DIR, exist_ok=True)
+        with open(_profile_cache_path(profile_url), "w", encoding="utf-8") as f:
+            json.dump(details, f, ensure_ascii=False)
+    except OSError:
+        pass  # cache is best-effort
+
+@functools.lru_cache(maxsize=512)
+def _fetch_profile_details(profile_url: str) -> dict:
+    """Fetch and extract one profile; memoized per URL for the process.
+
+    The same defender appears in several rumour rows (one per interested
+    club), so the listing can ask for one profile repeatedly. Raises on
+    fetch errors — lru_cache doesn't memoize exceptions, so failures
+    stay retryable while extract_player_details absorbs them.
+    """
+    cached = _load_cached_details(profile_url)
+    if cached is not None:
+        return cached
+    _PROFILE_LIMITER.wait()  # only rate-limit actual network fetches
+    tree = parse_html(fetch_html(profile_url))
+
+    # AGE: derive from birthdate (data-zeit is unix ts of DOB)
+    age = ""
+    dob_span = css_first(tree, "span[data-zeit]")
+    if dob_span and attr(dob_span, "data-zeit").isdigit():
+        birth_ts = int(attr(dob_span, "data-zeit"))
+        years = (int(time.time()) - birth_ts) // _SECS_PER_YEAR
+        if 14 <= years <= 50:  # sanity bounds
+            age = str(years)
+
+    # NATIONALITY
+    nationality = ""
+    nat_imgs = css(tree, "img.flaggenrahmen[title]")
+    if nat_imgs:
+        nationality = ", ".join(attr(img, "title") for img in nat_imgs if attr(img, "title"))
+
+    # CONTRACT EXPIRY (EN locale)
+    contract_expiry = ""
+    # known TM structure first: the info table pairs a label span with a
+    # value span, so only the handful of label nodes get inspected
+    for lab in css(tree, "span.info-table__content--regular"):
+        if "Contract expires" in raw_text(lab):
+            nx = next_sibling_element(lab)
+            if nx is not None:
+                contract_expiry = text(nx)
+            break
+    if not contract_expiry:
+        # generic fallback: scan spans/divs, paying for normalization only
+        # on the (single) containment hit
+        for el in css(tree, "span, div"):
+            t = raw_text(el)
+            if "Contract expires" in t:
+                trailing = norm(t.split("Contract expires", 1)[1].strip(" :"))
+                if trailing:
+                    contract_expiry = trailing
+                else:
+                    nx = next_sibling_element(el)
+                    if nx is not None:
+                        contract_expiry = text(nx)
+                break
+
+    # MARKET VALUE (first currency value in header)
+    market_value = ""
+    mv_wrap = css_first(tree, "div.data-header__market-value-wrapper")
+    if mv_wrap:
+        # Typically like: "€20.00m Last update: ..."
+        val = _MV_RE.search(text(mv_wrap))
+        if val:
+            market_value = val.group(1)
+
+    details = {
+        "age": age,
+        "nationality": nationality,
+        "contract_expiry": contract_expiry,
+        "market_value": market_value,
+    }
+    if any(details.values()):  # don't cache empty extractions
+        _store_cached_details(profile_url, details)
+    return details
+
+def extract_player_details(profile_url: str) -> dict:
+    """Best-effort extraction from player profile page with graceful fallbacks."""
+    try:
+        return dict(_fetch_profile_details(profile_url))
+    except Exception:
+        return dict(EMPTY_DETAILS)
+
+@dataclass(slots=True)
+class Rumour:
+    """One defender rumour row; detail fields are filled from the profile."""
+    player: str = ""
+    position: str = ""
+    profile_link: str = ""
+    current_club: str = ""
+    current_club_logo: str = ""
+    interested_club: str = ""
+    interested_club_logo: str = ""
+    rumour_date: str = ""
+    probability: Optional[int] = None
+    source_name: str = ""
+    source_link: str = ""
+    transfer_type: str = ""
+    age: str = ""
+    nationality: str = ""
+    contract_expiry: str = ""
+    market_value: str = ""
+
+EMPTY_DETAILS = {
+    "age": "",
+    "nationality": "",
+    "contract_expiry": "",
+    "market_value": "",
+}
+
+def fetch_profile_details(items: List[Rumour]) -> None:
+    """Fill age/nationality/contract/market value by fetching player profiles.
+
+    The fetches are pure I/O, so a small thread pool overlaps them; the
+    shared rate limiter keeps the aggregate request rate polite.
+    """
+    def worker(item: Rumour) -> dict:
+        if not item.profile_link:
+            return EMPTY_DETAILS
+        if (item.age and item.nationality
+                and item.contract_expiry and item.market_value):
+            return EMPTY_DETAILS  # listing row already had everything
+        return extract_player_details(item.profile_link)
+
+    with ThreadPoolExecutor(max_workers=PROFILE_WORKERS) as ex:
+        for item, details in zip(items, ex.map(worker, items)):
+            for field, value in details.items():
+                # fill gaps only; inline listing values win over the profile
+                if value and not getattr(item, field):
+                    setattr(item, field, value)
+
+def extract_rumour_row(tr) -> Optional[Rumour]:
+    """Parse a single rumours table row."""
+    # Cheap prefilter: the position label sits somewhere in the row markup,
+    # so a row without any defender keyword in its raw HTML can be dropped
+    # before paying for per-cell selectors. False positives (keyword in an
+    # attribute) just fall through to the full parse.
+    if not _DEFENDER_RE.search(node_html(tr)):
+        return None
+
+    tds = child_tds(tr)
+    if not tds:
+        return None
+
+    # Player cell
+    player_cell = tds[0]
+    player_link = css_first(player_cell, "a[href*='/profil/spieler/']")
+    player_name = text(player_link)
+    profile_href = attr(player_link, "href")
+    profile_url = abs_url(profile_href)
+
+    # Position (within inline-table / small tags). Test the raw text and
+    # only pay for whitespace normalization on a keyword hit — the common
+    # case is a miss.
+    position = ""
+    for el in css(player_cell, "table.inline-table td, small, span"):
+        raw = raw_text(el)
+        if raw and _DEFENDER_RE.search(raw):
+            position = norm(raw)
+            break
+
+    # Defender filter (the loop only sets a matching position)
+    if not position:
+        return None
+
+    # Club links: one traversal; first is the current club, last (if any
+    # others) the interested club
+    club_links = css(tr, "a.vereinprofil_tooltip")
+
+    def club_and_logo(club_a) -> Tuple[str, str]:
+        logo = css_first(club_a, "img.tiny_wappen")
+        logo_url = abs_url(attr(logo, "src")) if logo else ""
+        return text(club_a), logo_url
+
+    current_club = current_club_logo = ""
+    interested_club = interested_club_logo = ""
+    if club_links:
+        current_club, current_club_logo = club_and_logo(club_links[0])
+    if len(club_links) >= 2:
+        interested_club, interested_club_logo = club_and_logo(club_links[-1])
+
+    # Rumour date (often in the rightmost cell as <abbr title="2025-09-04">04/09/25</abbr>)
+    last_td = tds[-1]
+    date_abbr = css_first(last_td, "abbr[title], span[title]")
+    if date_abbr and attr(date_abbr, "title"):
+        rumour_date = attr(date_abbr, "title")
+    else:
+        # fallback to visible last cell text
+        rumour_date = text(last_td)
+
+    # Probability (best effort, based on style width%)
+    probability = None
+    prob_bar = css_first(tr, "[style*='width'][class*='bar'], [style*='width'][class*='wahrscheinlichkeit']")
+    if prob_bar:
+        probability = parse_prob_from_style(attr(prob_bar, "style"))
+
+    # Source (best effort)
+    source_name, source_link = "", ""
+    for a in css(tr, "a"):
+        href = attr(a, "href")
+        if href and ("/news/" in href or "/geruechte/" in href):
+            source_name = text(a)
+            source_link = abs_url(href)
+            break
+
+    # Age / nationality when the listing exposes them inline — saves the
+    # profile fetch for rows that turn out complete
+    age = ""
+    age_el = css_first(tr, "td.zentriert.alter")
+    if age_el:
+        t = text(age_el)
+        if t.isdigit():
+            age = t
+    nationality = ", ".join(
+        t for t in (attr(img, "title") for img in css(tr, "img.flaggenrahmen[title]")) if t)
+
+    # Transfer type heuristic: read any tooltip titles/images suggesting Loan/Free/Return
+    transfer_type = ""
+    tips = css(tr, "[title]")
+    tip_text = " ".join(attr(tip, "title") for tip in tips).lower()
+    if "loan" in tip_text:
+        transfer_type = "Loan"
+    elif "return from loan" in tip_text or "end of loan" in tip_text:
+        transfer_type = "Return/End of loan"
+    elif "free transfer" in tip_text or "without fee" in tip_text:
+        transfer_type = "Free"
+    elif "transfer" in tip_text or "wechsel" in tip_text:
+        transfer_type = "Transfer"
+    # otherwise leave empty; may be refined by detail page if needed
+
+    return Rumour(
+        player=player_name,
+        position=position,
+        profile_link=profile_url,
+        current_club=current_club,
+        current_club_logo=current_club_logo,
+        interested_club=interested_club,
+        interested_club_logo=interested_club_logo,
+        rumour_date=rumour_date,
+        probability=probability,
+        source_name=source_name,
+        source_link=source_link,
+        transfer_type=transfer_type,
+        age=age,
+        nationality=nationality,
+    )
+
+# Row template built once; format_map fills pre-escaped fields, which is
+# far fewer opcodes per row than the old nested multi-line f-string.
+_EMAIL_ROW_TMPL = (
+    "<tr>"
+    '<td><a href="{profile_link}"><strong>{player}</strong></a></td>'
+    "<td>{position}</td>"
+    '<td><div class="club">{current_logo_img}<span>{current_club}</span></div></td>'
+    '<td><div class="club">{interested_logo_img}<span>{interested_club}</span></div></td>'
+    '<td><span class="tag">{transfer_type}</span></td>'
+    "<td>{prob}</td>"
+    "<td>{age}</td>"
+    "<td>{nationality}</td>"
+    "<td>{contract_expiry}</td>"
+    "<td>{market_value}</td>"
+    "<td>{rumour_date}</td>"
+    "<td>{source_html}</td>"
+    "</tr>"
+)
+
+def build_email_html(items: List[Rumour], source_url: str) -> str:
+    """Inline-styled HTML email with alternating black/grey rows and club logos."""
+    css = """
+      body { font-family: Segoe UI, Arial, sans-serif; background:#0b0b0b; color:#eaeaea; }
+      .wrap { max-width: 960px; margin: 0 auto; }
+      h2 { color:#ffffff; }
+      table { border-collapse: collapse; width: 100%; }
+      th, td { padding: 8px 10px; vertical-align: middle; }
+      th { background:#000; color:#fff; text-align:left; position: sticky; top: 0; }
+      tr:nth-child(odd)  { background:#111; color:#f0f0f0; }
+      tr:nth-child(even) { background:#2b2b2b; color:#f0f0f0; }
+      a { color:#9bd5ff; text-decoration: none; }
+      .club { display:flex; align-items:center; gap:8px; }
+      .club img { height:18px; width:18px; object-fit:contain; border-radius: 2px; background:#fff; }
+      .tag { background:#444; padding:2px 6px; border-radius:10px; font-size:12px; color:#ddd; }
+      .meta { font-size:12px; color:#bbb; }
+    """.strip()
+
+    header = f"""
+    <div class="wrap">
+      <h2>Bundesliga Defender Rumours – {dt.datetime.utcnow().strftime('%Y-%m-%d')} (UTC)</h2>
+      <div class="meta">Source: <a href="{esc(source_url)}">{esc(source_url)}</a></div>
+      <table role="table" aria-label="Bundesliga Defender Rumours">
+        <thead>
+          <tr>
+            <th>Player</th>
+            <th>Position</th>
+            <th>Current Club</th>
+            <th>Interested Club</th>
+            <th>Type</th>
+            <th>Probability</th>
+            <th>Age</th>
+            <th>Nationality</th>
+            <th>Contract</th>
+            <th>Market Value</th>
+            <th>Rumour Date</th>
+            <th>Source</th>
+          </tr>
+        </thead>
+        <tbody>
+    """.strip()
+
+    rows = []
+    for it in items:
+        src_html = (f'<a href="{esc(it.source_link)}">{esc(it.source_name or "Link")}</a>'
+                    if it.source_link else esc(it.source_name))
+        rows.append(_EMAIL_ROW_TMPL.format_map({
+            "profile_link": esc(it.profile_link),
+            "player": esc(it.player),
+            "position": esc(it.position),
+            "current_logo_img": (f'<img src="{esc(it.current_club_logo)}" alt="">'
+                                 if it.current_club_logo else ""),
+            "current_club": esc(it.current_club),
+            "interested_logo_img": (f'<img src="{esc(it.interested_club_logo)}" alt="">'
+                                    if it.interested_club_logo else ""),
+            "interested_club": esc(it.interested_club),
+            "transfer_type": esc(it.transfer_type),
+            "prob": f"{it.probability}%" if it.probability is not None else "",
+            "age": esc(it.age),
+            "nationality": esc(it.nationality),
+            "contract_expiry": esc(it.contract_expiry),
+            "market_value": esc(it.market_value),
+            "rumour_date": esc(it.rumour_date),
+            "source_html": src_html,
+        }))
+
+    footer = """
+        </tbody>
+      </table>
+    </div>
+    """.strip()
+
+    return f"<html><head><meta charset='utf-8'><style>{css}</style></head><body>{header}\n" + "\n".join(rows) + f"\n{footer}</body></html>"
+
+def atomic_write_bytes(path: str, data: bytes) -> None:
+    # write-to-temp + rename: consumers (and a killed CI run) never see a
+    # partially written artifact, and bytes skip the TextIOWrapper encode
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def write_json(path: str, payload: dict) -> None:
+    if orjson is not None:
+        data = orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+    atomic_write_bytes(path, data)
+
+def main():
+    tree = parse_html(extract_table_fragment(fetch_html(URL)))
+
+    table = css_first(tree, "table.items")
+    rows = table_rows(table)
+
+    items: List[Rumour] = [it for it in map(extract_rumour_row, rows) if it]
+
+    if FETCH_PROFILES:
+        fetch_profile_details(items)
+    # else: the Rumour defaults already leave the detail fields empty
+
+    # Deterministic order: highest probability first, unknowns last,
+    # player name as tiebreak. sort(key=...) computes each key once.
+    items.sort(key=lambda it: (it.probability is None,
+                               -(it.probability or 0),
+                               it.player))
+
+    # Output
+    os.makedirs("out", exist_ok=True)
+    payload = {
+        "generated_utc": dt.datetime.utcnow().replace(microsecond=0).isoformat() + "Z",
+        "source": URL,
+        "competition": COMPETITION,
+        "season": SEASON_ID,
+        "count": len(items),
+        "items": [asdict(it) for it in items],
+    }
+    write_json("out/defender_rumours.json", payload)
+
+    html = build_email_html(items, URL)
+    atomic_write_bytes("out/defender_rumours.html", html.encode("utf-8"))
+
+    print(f"Wrote out/defender_rumours.json ({len(items)} items)")
+    print(f"Wrote out/defender_rumours.html")